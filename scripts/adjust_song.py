@@ -23,52 +23,108 @@ Usage examples:
   
   # Save the result to a different file
   python adjust_song.py add song.json 2 --note G4 --duration 1 --output new_song.json
+  
+  # Write a gzip-compressed copy (any path ending in .gz); compressed songs load transparently
+  python adjust_song.py shift song.json 3 --output song.json.gz
+
+Only the standard library is required (orjson is used for parsing when it's
+installed), so for very large songs the script can also be run under PyPy:
+  pypy3 adjust_song.py timeshift song.json --start-time 4.0 --offset 2.5
 """
 
 import json
+import gzip
 import argparse
 from pathlib import Path
 from typing import List, Dict, Any, Union
 
+# Resolve the JSON functions once. orjson parses noticeably faster than the
+# stdlib but is optional. Dumping stays on the stdlib: its spacing ("[3, 4]")
+# is what the hand-edited song files use.
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+_dumps = json.dumps
+
 def load_song(filepath: str) -> Dict[str, Any]:
-    """Load a song from a JSON file"""
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    """Load a song from a JSON file (optionally gzip-compressed)"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    if data[:2] == b'\x1f\x8b':
+        data = gzip.decompress(data)
+    return _loads(data)
+
+_NOTE_HEAD = '    { "note": "%s", "time": '
+_REST_HEAD = '    { "rest": true, "time": '
+_DURATION_PIECE = ', "duration": %s, "measure": '
+
+def format_notes(notes: List[Dict[str, Any]]) -> str:
+    """Format notes as compact single-line JSON objects, one per line"""
+    if not notes:
+        return ''
+    
+    # The same pitches and durations recur throughout a song, so the text around
+    # each note's time is rendered once per (pitch, duration) and reused. The
+    # duration's type is part of the key so 1 and 1.0 keep their own spelling.
+    pieces = {}
+    rendered = []
+    for note in notes:
+        pitch = None if 'rest' in note else note["note"]
+        duration = note["duration"]
+        key = (pitch, duration, type(duration))
+        piece = pieces.get(key)
+        if piece is None:
+            head = _REST_HEAD if pitch is None else _NOTE_HEAD % pitch
+            piece = pieces[key] = (head, _DURATION_PIECE % (duration,))
+        rendered.append(piece[0] + str(note["time"]) + piece[1] + str(note["measure"]) + ' }')
+    
+    # Joining puts the commas between notes, so there's no last-note check
+    return ',\n'.join(rendered) + '\n'
+
+# Top-level fields are written one per line, but arrays like timeSignature stay
+# inline ("[3, 4]"), which json.dumps(..., indent=2) can't produce
+_HEADER_FIELDS = ("title", "artist", "bpm", "timeSignature", "tuning")
+_HEADER_TEMPLATE = '{\n' + ''.join(f'  "{field}": %s,\n' for field in _HEADER_FIELDS) + '  "notes": [\n'
 
 def save_song(song: Dict[str, Any], filepath: str):
     """Save a song to a JSON file with proper formatting"""
-    with open(filepath, 'w') as f:
-        # Write metadata with 2-space indentation
-        f.write('{\n')
-        f.write('  "title": ' + json.dumps(song["title"]) + ',\n')
-        f.write('  "artist": ' + json.dumps(song["artist"]) + ',\n')
-        f.write('  "bpm": ' + json.dumps(song["bpm"]) + ',\n')
-        f.write('  "timeSignature": ' + json.dumps(song["timeSignature"]) + ',\n')
-        f.write('  "tuning": ' + json.dumps(song["tuning"]) + ',\n')
-        f.write('  "notes": [\n')
-        
-        # Write notes in compact format
-        for i, note in enumerate(song["notes"]):
-            # Format note data in compact single-line format
-            if 'rest' in note:
-                note_str = f'    {{ "rest": true, "time": {note["time"]}, "duration": {note["duration"]}, "measure": {note["measure"]} }}'
-            else:
-                note_str = f'    {{ "note": "{note["note"]}", "time": {note["time"]}, "duration": {note["duration"]}, "measure": {note["measure"]} }}'
-            
-            # Add comma if not the last note
-            if i < len(song["notes"]) - 1:
-                note_str += ','
-            
-            f.write(note_str + '\n')
-        
-        # Close array and object
-        f.write('  ]\n')
-        f.write('}\n')
+    # Build the whole document up front and write it in one go
+    parts = []
+    
+    # Metadata with 2-space indentation
+    parts.append(_HEADER_TEMPLATE % tuple(_dumps(song[field]) for field in _HEADER_FIELDS))
+    
+    # Notes in compact format
+    parts.append(format_notes(song["notes"]))
+    
+    # Close array and object
+    parts.append('  ]\n')
+    parts.append('}\n')
+    
+    document = ''.join(parts)
+    
+    # Paths ending in .gz get a cheap (level 1) gzip pass to cut the bytes written
+    if str(filepath).endswith('.gz'):
+        with gzip.open(filepath, 'wb', compresslevel=1) as f:
+            f.write(document.encode('utf-8'))
+    else:
+        with open(filepath, 'w') as f:
+            f.write(document)
 
 def get_beats_per_measure(song: Dict[str, Any]) -> float:
     """Get the number of beats per measure from the time signature"""
     return song["timeSignature"][0]
 
+# The helpers below test every note rather than searching for a split point:
+# songs with several movements restart the time at each movement while the
+# measure numbers keep counting, so notes are in neither measure nor time order.
+
+def _moved_note(note: Dict[str, Any], time: float, measure: int) -> Dict[str, Any]:
+    """Build a copy of a note (or rest) placed at a new time and measure"""
+    # Copy every field: older songs store string/fret/color instead of a note name
+    return {**note, "time": time, "measure": measure}
+
 def shift_measures(song: Dict[str, Any], measure_index: int) -> Dict[str, Any]:
     """
     Shift all measures at and after the given index forward by one measure.
@@ -81,23 +137,21 @@ def shift_measures(song: Dict[str, Any], measure_index: int) -> Dict[str, Any]:
         Updated song dictionary with shifted measures
     """
     beats_per_measure = get_beats_per_measure(song)
+    first_measure = measure_index + 1
+    notes = song["notes"]
     
-    # Create a new list for adjusted notes
-    adjusted_notes = []
+    # Nothing to move when no note is at or after the shift point
+    start = next((i for i, note in enumerate(notes) if note["measure"] >= first_measure), None)
+    if start is None:
+        return song
     
-    # Add notes before the shift point unchanged
-    for note in song["notes"]:
-        if note["measure"] < measure_index + 1:
-            adjusted_notes.append(note)
-        else:
-            # Shift notes at and after the measure point
-            adjusted_note = note.copy()
-            adjusted_note["time"] += beats_per_measure
-            adjusted_note["measure"] += 1
-            adjusted_notes.append(adjusted_note)
-    
-    # Update the song with adjusted notes
-    song["notes"] = adjusted_notes
+    # Notes before the first one that moves stay as a slice; from there on, keep
+    # notes before the shift point unchanged and shift notes at and after it
+    song["notes"] = notes[:start] + [
+        note if note["measure"] < first_measure
+        else _moved_note(note, note["time"] + beats_per_measure, note["measure"] + 1)
+        for note in notes[start:]
+    ]
     return song
 
 def add_measure_with_note(song: Dict[str, Any], measure_index: int, new_note: Dict[str, Any]) -> Dict[str, Any]:
@@ -112,24 +166,29 @@ def add_measure_with_note(song: Dict[str, Any], measure_index: int, new_note: Di
     Returns:
         Updated song dictionary with new measure and note
     """
-    # First shift everything forward
-    song = shift_measures(song, measure_index)
-    
-    # Then insert the new note at the correct position
     beats_per_measure = get_beats_per_measure(song)
+    first_measure = measure_index + 1
     new_note["time"] = measure_index * beats_per_measure
-    new_note["measure"] = measure_index + 1
+    new_note["measure"] = first_measure
     
-    # Insert the new note in the correct position
-    insertion_index = 0
-    for i, note in enumerate(song["notes"]):
-        if note["measure"] > measure_index + 1:
-            insertion_index = i
-            break
-        elif i == len(song["notes"]) - 1:
-            insertion_index = len(song["notes"])
+    # One pass over the notes: earlier measures stay put and the rest move
+    # forward one measure. The new note goes in just before the first moved
+    # note, or at the end when nothing moves.
+    adjusted_notes = []
+    append = adjusted_notes.append
+    inserted = False
+    for note in song["notes"]:
+        if note["measure"] < first_measure:
+            append(note)
+            continue
+        if not inserted:
+            append(new_note)
+            inserted = True
+        append(_moved_note(note, note["time"] + beats_per_measure, note["measure"] + 1))
+    if not inserted:
+        append(new_note)
     
-    song["notes"].insert(insertion_index, new_note)
+    song["notes"] = adjusted_notes
     return song
 
 def remove_measure(song: Dict[str, Any], measure_index: int) -> Dict[str, Any]:
@@ -144,23 +203,16 @@ def remove_measure(song: Dict[str, Any], measure_index: int) -> Dict[str, Any]:
         Updated song dictionary with measure removed and subsequent measures shifted
     """
     beats_per_measure = get_beats_per_measure(song)
+    removed_measure = measure_index + 1
     
-    # Create a new list for adjusted notes
-    adjusted_notes = []
-    
-    # Add notes before the removal point unchanged
-    for note in song["notes"]:
-        if note["measure"] < measure_index + 1:
-            adjusted_notes.append(note)
-        elif note["measure"] > measure_index + 1:
-            # Adjust timing and measure number for notes after the removed measure
-            adjusted_note = note.copy()
-            adjusted_note["time"] -= beats_per_measure
-            adjusted_note["measure"] -= 1
-            adjusted_notes.append(adjusted_note)
-    
-    # Update the song with adjusted notes
-    song["notes"] = adjusted_notes
+    # Keep notes before the removal point unchanged, drop the removed measure and
+    # pull the timing and measure number of everything after it back by one
+    song["notes"] = [
+        note if note["measure"] < removed_measure
+        else _moved_note(note, note["time"] - beats_per_measure, note["measure"] - 1)
+        for note in song["notes"]
+        if note["measure"] != removed_measure
+    ]
     return song
 
 def shift_by_time(song: Dict[str, Any], start_time: float, time_offset: float) -> Dict[str, Any]:
@@ -175,29 +227,24 @@ def shift_by_time(song: Dict[str, Any], start_time: float, time_offset: float) -
     Returns:
         Updated song dictionary with time-shifted notes
     """
-    # Create a new list for adjusted notes
-    adjusted_notes = []
-    
     # Get beats per measure for recalculating measure numbers
     beats_per_measure = get_beats_per_measure(song)
     
-    # Process each note
-    for note in song["notes"]:
-        if note["time"] >= start_time:
-            # Shift notes at or after the time point
-            adjusted_note = note.copy()
-            adjusted_note["time"] += time_offset
-            
-            # Recalculate measure number based on new time
-            adjusted_note["measure"] = int(adjusted_note["time"] / beats_per_measure) + 1
-            
-            adjusted_notes.append(adjusted_note)
-        else:
-            # Keep notes before the shift point unchanged
-            adjusted_notes.append(note)
+    notes = song["notes"]
     
-    # Update the song with adjusted notes
-    song["notes"] = adjusted_notes
+    # Nothing to move when no note is at or after the time point
+    start = next((i for i, note in enumerate(notes) if note["time"] >= start_time), None)
+    if start is None:
+        return song
+    
+    # Notes before the first one that moves stay as a slice; from there on, keep
+    # notes before the time point unchanged and shift the rest, recalculating
+    # their measure number from the new time
+    song["notes"] = notes[:start] + [
+        note if note["time"] < start_time
+        else _moved_note(note, (time := note["time"] + time_offset), int(time / beats_per_measure) + 1)
+        for note in notes[start:]
+    ]
     return song
 
 def main():
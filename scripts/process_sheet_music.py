@@ -2,28 +2,65 @@
 
 import os
 import glob
+import heapq
 import subprocess
 import zipfile
 import shutil
+import tempfile
+import urllib.error
 import urllib.request
-import json
 import xml.etree.ElementTree as ET
 import argparse
+import functools
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import accumulate, repeat
 
+from adjust_song import save_song
+
+# lxml parses MusicXML considerably faster; it's optional, so fall back to the stdlib parser
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+# MusicXML <alter> values (in semitones) to accidental suffixes
+_ACCIDENTALS = {0: '', 1: '#', -1: 'b', 2: '##', -2: 'bb'}
+
+def iter_elements(source, events, tags):
+    """Stream (event, element) pairs from an XML file for the given tags only"""
+    if lxml_etree is not None:
+        # lxml filters the tags in C, so uninteresting elements never reach Python
+        return lxml_etree.iterparse(source, events=events, tag=tags)
+    return ((event, elem) for event, elem in ET.iterparse(source, events=events) if elem.tag in tags)
+
+# Durations come from a handful of values per score, so each (duration,
+# divisions) pair is converted once
+@functools.lru_cache(maxsize=None)
 def parse_duration(duration: str, divisions: int) -> float:
     """Convert MusicXML duration to beats"""
     return float(duration) / divisions
 
+# A score only uses a few dozen pitches, so each name is built once and the
+# same string is shared by every note with that pitch
+@functools.lru_cache(maxsize=512)
+def note_name(step: str, alter: Optional[str], octave: str) -> str:
+    """Build a note name like "F#4" from MusicXML pitch parts"""
+    # Handle accidentals
+    accidental = _ACCIDENTALS.get(0 if alter is None else int(alter), '')
+    return step + accidental + octave
+
 def get_note_info(note_elem: ET.Element, divisions: int) -> Optional[Dict[str, Any]]:
     """Extract note information from a MusicXML note element"""
+    find = note_elem.find
+    
     # Check if it's a rest
-    is_rest = note_elem.find('rest') is not None
+    is_rest = find('rest') is not None
     
     # Get duration
-    duration_elem = note_elem.find('duration')
+    duration_elem = find('duration')
     if duration_elem is None:
         return None
     duration = parse_duration(duration_elem.text, divisions)
@@ -36,159 +73,182 @@ def get_note_info(note_elem: ET.Element, divisions: int) -> Optional[Dict[str, A
         }
     
     # Get pitch information
-    pitch_elem = note_elem.find('pitch')
+    pitch_elem = find('pitch')
     if pitch_elem is None:
         return None
         
-    step = pitch_elem.find('step').text
-    octave = pitch_elem.find('octave').text
-    
-    # Handle accidentals
-    alter_elem = pitch_elem.find('alter')
-    alter = 0 if alter_elem is None else int(alter_elem.text)
-    
-    # Convert pitch to note name
-    accidental = ''
-    if alter == 1:
-        accidental = '#'
-    elif alter == -1:
-        accidental = 'b'
-    elif alter == 2:
-        accidental = '##'
-    elif alter == -2:
-        accidental = 'bb'
-    
-    note = f"{step}{accidental}{octave}"
+    find_in_pitch = pitch_elem.find
+    alter_elem = find_in_pitch('alter')
+    note = note_name(
+        find_in_pitch('step').text,
+        None if alter_elem is None else alter_elem.text,
+        find_in_pitch('octave').text
+    )
     
     return {
         "note": note,
         "duration": duration
     }
 
-def combine_parts(parts):
-    """Combine multiple parts into a single timeline of notes"""
-    notes_by_time = defaultdict(list)
+def combine_parts(parts) -> Tuple[List[Dict[str, Any]], Dict[str, Optional[str]]]:
+    """Combine multiple parts into a single timeline of notes.
+    
+    Also returns the title and composer found in the first part's header, so the
+    metadata doesn't need a second parse.
+    """
+    part_notes = []
+    header = {}
     measure_number = 1  # Initialize measure counter
     
-    for part_path in parts:
-        # Parse the XML file
-        tree = ET.parse(part_path)
-        root = tree.getroot()
+    for index, part_path in enumerate(parts):
+        notes = []
+        part_notes.append(notes)
+        divisions = None
         
-        # Get divisions from the first measure's attributes
-        first_measure = root.find('.//measure')
-        if first_measure is None:
-            continue
+        # Stream the XML file a measure at a time rather than building the whole tree.
+        # Start events are only used to track the enclosing <part>.
+        tags = ('part', 'measure', 'work-title', 'creator') if index == 0 else ('part', 'measure')
+        part = None
+        finished = None
+        for event, elem in iter_elements(str(part_path), ('start', 'end'), tags):
+            tag = elem.tag
+            if event == 'start':
+                if tag == 'part':
+                    part, finished = elem, None
+                continue
+            if tag == 'work-title':
+                header.setdefault('title', elem.text)
+                continue
+            if tag == 'creator':
+                if elem.get('type') == 'composer':
+                    header.setdefault('artist', elem.text)
+                continue
+            if tag != 'measure':
+                continue
+            measure = elem
             
-        attributes = first_measure.find('attributes')
-        if attributes is None:
-            continue
-            
-        divisions_elem = attributes.find('divisions')
-        if divisions_elem is None:
-            continue
+            # Get divisions from the first measure's attributes
+            if divisions is None:
+                divisions_text = measure.findtext('attributes/divisions')
+                if divisions_text is None:
+                    break
+                divisions = int(divisions_text)
             
-        divisions = int(divisions_elem.text)
-        
-        current_time = 0
-        for measure in root.findall('.//measure'):
-            for note in measure.findall('.//note'):
+            # iter() walks the measure in C, without going through ElementPath
+            for note in measure.iter('note'):
                 note_info = get_note_info(note, divisions)  # Pass divisions to get_note_info
                 if note_info:
-                    note_info['time'] = current_time
                     note_info['measure'] = measure_number  # Add measure number to note info
-                    notes_by_time[current_time].append(note_info)
-                    current_time += note_info['duration']
+                    notes.append(note_info)
             measure_number += 1  # Increment measure number after each measure
+            
+            # Done with this measure, release its notes. The emptied measure is
+            # detached on the next pass; dropping the element the parser has only
+            # just closed isn't safe with lxml.
+            measure.clear()
+            if finished is not None:
+                part.remove(finished)
+            finished = measure if part is not None else None
+        
+        # Each note starts where the previous one ended, so the start times are a
+        # running total of the durations - accumulate does the sum in one C loop
+        for note_info, start in zip(notes, accumulate([note_info['duration'] for note_info in notes], initial=0)):
+            note_info['time'] = start
     
-    # Convert defaultdict to regular dict
-    return dict(notes_by_time)
+    # Each part's notes are already in time order, so merge them rather than
+    # regrouping by time; notes sharing a time stay in part order
+    return list(heapq.merge(*part_notes, key=lambda note: note['time'])), header
+
+def song_metadata(header: Dict[str, Optional[str]], base_name: str) -> Dict[str, Any]:
+    """Build song metadata from the title/composer header returned by combine_parts"""
+    title = header.get('title', base_name)
+    artist = header.get('artist', "Unknown")
+    
+    # Default metadata for studies
+    return {
+        "title": title if "study" not in base_name.lower() else "Study No. 1",
+        "artist": artist,
+        "bpm": 92,  # Standard tempo for studies
+        "timeSignature": [3, 4],  # Common time signature for guitar studies
+        "tuning": ["E4", "B3", "G3", "D3", "A2", "E2"]  # Standard guitar tuning
+    }
+
+def song_json_path(base_name: str, output_dir: Path) -> Path:
+    """Path of a song's JSON file, with a normalized filename"""
+    return output_dir / (base_name.lower().replace(" ", "-") + ".json")
 
-def convert_to_json(xml_dir: Path, output_dir: Path):
-    """Convert XML files to internal JSON format"""
-    # Group XML files by base name (without mvt number)
-    xml_groups = {}
+def is_up_to_date(json_path: Path, xml_files: List[Path]) -> bool:
+    """Check whether a song's JSON file is newer than all of its XML files"""
+    try:
+        json_mtime = json_path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    # Strictly newer, so a JSON written in the same timestamp tick as an XML
+    # file is converted again rather than trusted
+    return all(json_mtime > xml_file.stat().st_mtime for xml_file in xml_files)
+
+def convert_group(base_name: str, xml_files: List[Path], output_dir: Path):
+    """Convert one song's XML files (all of its movements) to internal JSON format"""
+    try:
+        print(f"Converting {base_name} to JSON format...")
+        
+        # Get notes from all parts in time order, plus the first movement's header
+        notes, header = combine_parts(xml_files)
+        metadata = song_metadata(header, base_name)
+        
+        # Write the JSON file in the same compact layout adjust_song uses
+        save_song({**metadata, "notes": notes}, song_json_path(base_name, output_dir))
+        
+        print(f"Successfully converted {base_name}")
+        
+    except Exception as e:
+        print(f"Error converting {base_name}: {e}")
+
+def convert_to_json(xml_dir: Path, output_dir: Path, force_replace: bool = False):
+    """Convert XML files to internal JSON format, skipping songs whose JSON is up to date"""
+    # Group XML files by base name (without mvt number), keyed by movement so
+    # each filename is only parsed once
+    keyed_groups = defaultdict(list)
     for xml_file in xml_dir.glob("*.xml"):
-        base_name = xml_file.stem.split(".mvt")[0] if ".mvt" in xml_file.stem else xml_file.stem
-        if base_name not in xml_groups:
-            xml_groups[base_name] = []
-        xml_groups[base_name].append(xml_file)
+        base_name, _, movement = xml_file.stem.partition(".mvt")
+        keyed_groups[base_name].append((int(movement) if movement.isdigit() else 0, xml_file))
     
-    # Process each group
-    for base_name, xml_files in xml_groups.items():
-        try:
-            print(f"Converting {base_name} to JSON format...")
-            
-            # Get notes from all parts
-            notes_by_time = combine_parts(xml_files)
-            
-            # Parse the first XML file for metadata
-            tree = ET.parse(xml_files[0])
-            root = tree.getroot()
-            
-            # Extract metadata
-            work = root.find('.//work-title')
-            title = work.text if work is not None else base_name
-            
-            composer = root.find('.//creator[@type="composer"]')
-            artist = composer.text if composer is not None else "Unknown"
-            
-            # Default metadata for studies
-            metadata = {
-                "title": title if "study" not in base_name.lower() else "Study No. 1",
-                "artist": artist,
-                "bpm": 92,  # Standard tempo for studies
-                "timeSignature": [3, 4],  # Common time signature for guitar studies
-                "tuning": ["E4", "B3", "G3", "D3", "A2", "E2"]  # Standard guitar tuning
-            }
-            
-            # Save to JSON file with normalized filename
-            json_filename = base_name.lower().replace(" ", "-") + ".json"
-            json_path = output_dir / json_filename
-            
-            # Format and write the JSON file
-            with open(json_path, 'w') as f:
-                # Write metadata with 2-space indentation
-                f.write('{\n')
-                f.write('  "title": ' + json.dumps(metadata["title"]) + ',\n')
-                f.write('  "artist": ' + json.dumps(metadata["artist"]) + ',\n')
-                f.write('  "bpm": ' + json.dumps(metadata["bpm"]) + ',\n')
-                f.write('  "timeSignature": ' + json.dumps(metadata["timeSignature"]) + ',\n')
-                f.write('  "tuning": ' + json.dumps(metadata["tuning"]) + ',\n')
-                f.write('  "notes": [\n')
-                
-                # Write notes in compact format
-                times = sorted(notes_by_time.keys())
-                for i, time in enumerate(times):
-                    notes = notes_by_time[time]
-                    
-                    # Write all notes at this time
-                    for j, note in enumerate(notes):
-                        # Format note data in compact single-line format
-                        if 'rest' in note:
-                            note_str = f'    {{ "rest": true, "time": {note["time"]}, "duration": {note["duration"]}, "measure": {note["measure"]} }}'
-                        else:
-                            note_str = f'    {{ "note": "{note["note"]}", "time": {note["time"]}, "duration": {note["duration"]}, "measure": {note["measure"]} }}'
-                        
-                        # Add comma if not the last note
-                        if i < len(times) - 1 or j < len(notes) - 1:
-                            note_str += ','
-                        
-                        f.write(note_str + '\n')
-                
-                # Close array and object
-                f.write('  ]\n')
-                f.write('}\n')
-            
-            print(f"Successfully converted {base_name}")
-            
-        except Exception as e:
-            print(f"Error converting {base_name}: {e}")
-            continue
+    # Put each song's movements in order, regardless of directory listing order
+    xml_groups = {
+        base_name: [xml_file for _, xml_file in sorted(keyed_files)]
+        for base_name, keyed_files in keyed_groups.items()
+    }
+    
+    # Leave songs alone when their JSON is newer than every XML file they come from
+    if not force_replace:
+        for base_name, xml_files in list(xml_groups.items()):
+            if is_up_to_date(song_json_path(base_name, output_dir), xml_files):
+                print(f"Skipping {base_name} - JSON is up to date (use --force to reconvert)")
+                del xml_groups[base_name]
+    
+    # Each group reads its own XML files and writes its own JSON file, so the
+    # groups can be converted side by side in separate processes
+    workers = min(len(xml_groups), os.cpu_count() or 1)
+    if workers <= 1:
+        for base_name, xml_files in xml_groups.items():
+            convert_group(base_name, xml_files, output_dir)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(convert_group, xml_groups.keys(), xml_groups.values(), repeat(output_dir)))
 
+@functools.lru_cache(maxsize=None)
 def get_audiveris_jar():
     """Get the path to the Audiveris executable"""
     audiveris_path = Path("audiveris/app/build/distributions")
+    cache_file = audiveris_path / ".resolved_exec"
+    
+    # Reuse the executable found on a previous run unless a newer build has appeared since
+    if cache_file.exists():
+        cached_executable = Path(cache_file.read_text().strip())
+        newest_build = max((p.stat().st_mtime for p in audiveris_path.glob("app-*")), default=0)
+        if cached_executable.exists() and cache_file.stat().st_mtime > newest_build:
+            return cached_executable
     
     # First check if we have an extracted directory
     version_dirs = [d for d in audiveris_path.glob("app-*") if d.is_dir()]
@@ -219,6 +279,7 @@ def get_audiveris_jar():
     if not executable.exists():
         raise FileNotFoundError(f"Audiveris executable not found at {executable}")
     
+    cache_file.write_text(str(executable))
     return executable
 
 def extract_xml_from_mxl(mxl_path, xml_dir):
@@ -227,88 +288,211 @@ def extract_xml_from_mxl(mxl_path, xml_dir):
     xml_path = xml_dir / xml_filename
     
     with zipfile.ZipFile(mxl_path, 'r') as zip_ref:
-        # MXL files typically contain a container.xml and the actual score
-        # We want the score XML file, which is usually named score.xml
-        for filename in zip_ref.namelist():
-            if filename.endswith('.xml') and not filename.startswith('META-INF') and filename != 'container.xml':
-                with zip_ref.open(filename) as source, open(xml_path, 'wb') as target:
-                    shutil.copyfileobj(source, target)
-                break
+        # MXL files contain a META-INF/container.xml that names the score file
+        try:
+            with zip_ref.open('META-INF/container.xml') as container:
+                score_name = ET.parse(container).getroot().find('.//{*}rootfile').get('full-path')
+            score = zip_ref.read(score_name)
+        except (KeyError, AttributeError, ET.ParseError):
+            # No usable container, fall back to the largest XML file that isn't
+            # metadata - the score dwarfs anything else packed alongside it
+            candidates = [
+                info for info in zip_ref.infolist()
+                if info.filename.endswith('.xml') and not info.filename.startswith('META-INF') and info.filename != 'container.xml'
+            ]
+            score = zip_ref.read(max(candidates, key=lambda info: info.file_size)) if candidates else None
+    
+    # Score XMLs are small, so write the whole thing in one go
+    if score is not None:
+        xml_path.write_bytes(score)
 
-def process_image(image_path, audiveris_exec, output_dir, xml_dir, force_replace=False):
-    """Process a single image with Audiveris"""
-    image_name = Path(image_path).stem
-    output_path = output_dir / image_name
-    
-    # Skip if already processed and not forcing replacement
-    if not force_replace and list(output_dir.glob(f"{image_name}*.mxl")):
-        print(f"Skipping {image_name} - already processed (use --force to reprocess)")
-        return
+def index_previous_outputs(output_dir, xml_dir):
+    """List the MXL and XML files from earlier runs once, keyed by image name"""
+    # Scores are saved as "<name>.mxl"/"<name>.xml", or "<name>.mvtN.*" per movement
+    scores = defaultdict(list)
+    for path in [*output_dir.glob("*.mxl"), *xml_dir.glob("*.xml")]:
+        scores[path.stem.partition(".mvt")[0]].append(path)
+    return scores
+
+def clean_previous_outputs(image_name, previous_scores):
+    """Remove the MXL, XML and JSON files produced by an earlier run for an image"""
+    # Remove existing MXL and XML files
+    for path in previous_scores.get(image_name, []):
+        path.unlink(missing_ok=True)
+    # Remove existing JSON file - its name is known, so there's nothing to list
+    songs_dir = Path(__file__).parent.parent / "public" / "songs"
+    (songs_dir / f"{image_name.lower()}.json").unlink(missing_ok=True)
+
+def collect_outputs(work_dir, output_dir, xml_dir):
+    """Move what Audiveris wrote into a batch directory to the output directory"""
+    # One pass over the directory, dispatching on the file type
+    with os.scandir(work_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(".mxl"):
+                # Move generated MXL files to output directory and extract their XML
+                new_path = output_dir / name
+                os.replace(entry.path, new_path)
+                extract_xml_from_mxl(new_path, xml_dir)
+            elif name.endswith(".log"):
+                os.replace(entry.path, output_dir / name)
+            elif name.endswith(".omr"):
+                # Clean up Audiveris temporary files
+                os.unlink(entry.path)
+
+def run_audiveris(audiveris_exec, image_paths):
+    """Run one Audiveris batch export over a list of images"""
+    subprocess.run([
+        str(audiveris_exec),
+        "-batch",
+        "-export",
+        *map(str, image_paths)
+    ], check=True)
+
+def process_batch(image_paths, audiveris_exec, output_dir, xml_dir):
+    """Run Audiveris over a batch of images in a scratch directory and collect the results"""
+    # Audiveris writes its outputs and logs next to its inputs, so each batch
+    # works on links to its images in a directory of its own. Concurrent
+    # batches can't pick up each other's files, and the scratch directory sits
+    # inside the output directory (not the tracked images directory), so
+    # outputs can still be moved with a rename.
+    with tempfile.TemporaryDirectory(prefix=".audiveris-", dir=output_dir) as work_dir:
+        work_dir = Path(work_dir)
+        links = []
+        for image_path in image_paths:
+            link = work_dir / Path(image_path).name
+            link.symlink_to(Path(image_path).resolve())
+            links.append(link)
+        
+        names = ', '.join(Path(p).stem for p in image_paths)
+        try:
+            run_audiveris(audiveris_exec, links)
+        except subprocess.CalledProcessError as e:
+            print(f"Error processing {names}: {e}")
+        except Exception as e:
+            print(f"Unexpected error processing {names}: {e}")
+        
+        # Collect outputs even after a failed run: one bad image fails the whole
+        # batch, and the other images' scores would go with the scratch directory
+        try:
+            collect_outputs(work_dir, output_dir, xml_dir)
+        except Exception as e:
+            print(f"Unexpected error collecting outputs for {names}: {e}")
+
+# Most images Audiveris is given in one run (one JVM start)
+MAX_BATCH_SIZE = 16
+
+def process_images(image_paths, audiveris_exec, output_dir, xml_dir, force_replace=False):
+    """Process images with Audiveris, batching them so each JVM start covers several images"""
+    # Names of images that already have MXL output (movements are saved as "<name>.mvtN.mxl")
+    processed = {mxl_file.stem.split(".mvt")[0] for mxl_file in output_dir.glob("*.mxl")}
     
-    print(f"Processing {image_name}...")
-    
-    # Clean up any existing files if force replacing
-    if force_replace:
-        # Remove existing MXL files
-        for mxl_file in output_dir.glob(f"{image_name}*.mxl"):
-            mxl_file.unlink()
-        # Remove existing XML files
-        for xml_file in xml_dir.glob(f"{image_name}*.xml"):
-            xml_file.unlink()
-        # Remove existing JSON files
-        for json_file in (Path(__file__).parent.parent / "public" / "songs").glob(f"{image_name.lower()}.json"):
-            json_file.unlink()
-    
-    # Run Audiveris
-    try:
-        subprocess.run([
-            str(audiveris_exec),
-            "-batch",
-            "-export",
-            str(image_path)
-        ], check=True)
+    # With --force, list the earlier outputs once rather than globbing every directory per image
+    previous_scores = index_previous_outputs(output_dir, xml_dir) if force_replace else None
+    
+    pending = []
+    for image_path in image_paths:
+        image_name = Path(image_path).stem
         
-        # Move generated MXL files to output directory
-        for mxl_file in Path(image_path).parent.glob(f"{image_name}*.mxl"):
-            new_path = output_dir / mxl_file.name
-            shutil.move(str(mxl_file), str(new_path))
-            
-            # Extract XML from MXL
-            extract_xml_from_mxl(new_path, xml_dir)
+        # Skip if already processed and not forcing replacement
+        if not force_replace and image_name in processed:
+            print(f"Skipping {image_name} - already processed (use --force to reprocess)")
+            continue
         
-        # Move all log files from images directory to output directory
-        for log_file in Path(image_path).parent.glob("*.log"):
-            new_log_path = output_dir / log_file.name
-            shutil.move(str(log_file), str(new_log_path))
-            
-        # Clean up Audiveris temporary files
-        omr_file = Path(image_path).parent / f"{image_name}.omr"
-        if omr_file.exists():
-            omr_file.unlink()
-            
-    except subprocess.CalledProcessError as e:
-        print(f"Error processing {image_name}: {e}")
-    except Exception as e:
-        print(f"Unexpected error processing {image_name}: {e}")
+        # Clean up any existing files if force replacing
+        if force_replace:
+            clean_previous_outputs(image_name, previous_scores)
+        
+        print(f"Processing {image_name}...")
+        pending.append(image_path)
+    
+    if not pending:
+        return
+    
+    # Audiveris is mostly single-threaded, but each run is a heavy JVM, so split
+    # the images into a batch per pair of cores and run the batches side by
+    # side. Threads are enough here since they just wait on the subprocesses.
+    # Batches are capped so one failed run doesn't lose too many images.
+    workers = max(1, min(len(pending), (os.cpu_count() or 1) // 2))
+    batch_count = max(workers, -(-len(pending) // MAX_BATCH_SIZE))
+    batches = [pending[i::batch_count] for i in range(batch_count)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda batch: process_batch(batch, audiveris_exec, output_dir, xml_dir), batches))
 
 def setup_tesseract_languages():
     """Set up English language data for Tesseract OCR"""
     # Define the tessdata directory in the user's Application Support
     tessdata_dir = Path.home() / "Library" / "Application Support" / "AudiverisLtd" / "audiveris" / "tessdata"
+    eng_traineddata = tessdata_dir / "eng.traineddata"
+    sentinel = tessdata_dir / ".eng_ok"
+    
+    # Nothing to do once the language data has been set up
+    if sentinel.exists():
+        return
+    
     tessdata_dir.mkdir(parents=True, exist_ok=True)
     
     # Check if English language data exists
-    eng_traineddata = tessdata_dir / "eng.traineddata"
     if not eng_traineddata.exists():
         print("Downloading English language data for OCR...")
         url = "https://github.com/tesseract-ocr/tessdata/raw/main/eng.traineddata"
-        urllib.request.urlretrieve(url, eng_traineddata)
+        partial = eng_traineddata.with_suffix(".part")
+        # ETag (or Last-Modified) of the file the partial download came from
+        validator = eng_traineddata.with_suffix(".part-validator")
+        
+        # Resume an interrupted download rather than starting over, but only if
+        # the file upstream hasn't changed since: with If-Range the server sends
+        # the whole file again instead of a tail that belongs to another version
+        request = urllib.request.Request(url)
+        offset = partial.stat().st_size if partial.exists() else 0
+        if offset and validator.exists():
+            request.add_header("Range", f"bytes={offset}-")
+            request.add_header("If-Range", validator.read_text())
+        
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            # The partial file is longer than the file upstream, so start over
+            if e.code != 416:
+                raise
+            response = urllib.request.urlopen(url)
+        
+        with response:
+            # A changed file, or a server that ignores ranges, sends the whole file again
+            resumed = response.status == 206
+            if resumed:
+                expected = response.headers.get("Content-Range", "").rpartition("/")[2]
+            else:
+                expected = response.headers.get("Content-Length", "")
+                # Remember which version this download is of, so a later run can resume it
+                etag = response.headers.get("ETag", "")
+                tag = etag if etag and not etag.startswith("W/") else response.headers.get("Last-Modified")
+                if tag:
+                    validator.write_text(tag)
+                else:
+                    validator.unlink(missing_ok=True)
+            with open(partial, 'ab' if resumed else 'wb') as out:
+                # The file is tens of MB, so copy in 1 MiB chunks
+                shutil.copyfileobj(response, out, length=1 << 20)
+        
+        # Only install a complete file. A short one stays behind to be resumed;
+        # one that overshot can't be trusted and is thrown away.
+        size = partial.stat().st_size
+        if expected.isdigit() and size != int(expected):
+            if size > int(expected):
+                partial.unlink()
+                validator.unlink(missing_ok=True)
+            raise IOError(f"Incomplete download of {url}: got {size} of {expected} bytes")
+        partial.replace(eng_traineddata)
+        validator.unlink(missing_ok=True)
         print("English language data installed successfully")
+    
+    sentinel.touch()
 
 def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Process sheet music images with Audiveris')
-    parser.add_argument('--force', action='store_true', help='Force reprocessing of all images')
+    parser.add_argument('--force', action='store_true', help='Force reprocessing of all images and regenerate every song JSON (discards edits made to the JSON files)')
     args = parser.parse_args()
     
     # Setup paths
@@ -343,12 +527,11 @@ def main():
         print("No image files found in the images directory")
         return
     
-    for image_path in image_files:
-        process_image(image_path, audiveris_exec, output_dir, xml_dir, args.force)
+    process_images(image_files, audiveris_exec, output_dir, xml_dir, args.force)
     
     # Convert processed XML files to JSON
     print("\nConverting XML files to JSON format...")
-    convert_to_json(xml_dir, songs_dir)
+    convert_to_json(xml_dir, songs_dir, args.force)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file